@@ -25,16 +25,24 @@ class VariantAffectsGene(_BaseModel, VariantAffectsGeneBase):
     dataSources: list[str] = _Field(default_factory=list)
 
     def generate_update(self):
+        return self.build_update(
+            sourceDomainId=self.sourceDomainId,
+            targetDomainId=self.targetDomainId,
+            dataSources=self.dataSources,
+        )
+
+    @classmethod
+    def build_update(cls, *, sourceDomainId, targetDomainId, dataSources):
         tnow = _datetime.datetime.utcnow()
-        query = {"sourceDomainId": self.sourceDomainId, "targetDomainId": self.targetDomainId}
+        query = {"sourceDomainId": sourceDomainId, "targetDomainId": targetDomainId}
 
         update = {
             "$set": {
                 "updated": tnow,
-                "type": self.edge_type,
+                "type": cls.edge_type,
             },
             "$setOnInsert": {"created": tnow},
-            "$addToSet": {"dataSources": {"$each": self.dataSources}},
+            "$addToSet": {"dataSources": {"$each": dataSources}},
         }
 
         return _UpdateOne(query, update, upsert=True)
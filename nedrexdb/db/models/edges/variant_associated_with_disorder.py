@@ -30,19 +30,30 @@ class VariantAssociatedWithDisorder(_BaseModel, VariantAssociatedWithDisorderBas
     effects: list[str] = []
 
     def generate_update(self):
+        return self.build_update(
+            sourceDomainId=self.sourceDomainId,
+            targetDomainId=self.targetDomainId,
+            accession=self.accession,
+            effects=self.effects,
+            reviewStatus=self.reviewStatus,
+            dataSources=self.dataSources,
+        )
+
+    @classmethod
+    def build_update(cls, *, sourceDomainId, targetDomainId, accession, effects, reviewStatus, dataSources):
         tnow = _datetime.datetime.utcnow()
 
-        query = {"accession": self.accession}
+        query = {"accession": accession}
 
         update = {
             "$set": {
                 "updated": tnow,
-                "type": self.edge_type,
-                "sourceDomainId": self.sourceDomainId,
-                "targetDomainId": self.targetDomainId,
-                "reviewStatus": self.reviewStatus,
+                "type": cls.edge_type,
+                "sourceDomainId": sourceDomainId,
+                "targetDomainId": targetDomainId,
+                "reviewStatus": reviewStatus,
             },
-            "$addToSet": {"effects": {"$each": self.effects}, "dataSources": {"$each": self.dataSources}},
+            "$addToSet": {"effects": {"$each": effects}, "dataSources": {"$each": dataSources}},
             "$setOnInsert": {
                 "created": tnow,
             },
@@ -32,22 +32,46 @@ class GenomicVariant(_BaseModel, GenomicVariantBase):
     variantType: str = ""
 
     def generate_update(self):
+        return self.build_update(
+            primaryDomainId=self.primaryDomainId,
+            domainIds=self.domainIds,
+            dataSources=self.dataSources,
+            chromosome=self.chromosome,
+            position=self.position,
+            referenceSequence=self.referenceSequence,
+            alternativeSequence=self.alternativeSequence,
+            variantType=self.variantType,
+        )
+
+    @classmethod
+    def build_update(
+        cls,
+        *,
+        primaryDomainId,
+        domainIds,
+        dataSources,
+        chromosome,
+        position,
+        referenceSequence,
+        alternativeSequence,
+        variantType,
+    ):
         tnow = _datetime.datetime.utcnow()
 
-        query = {"primaryDomainId": self.primaryDomainId}
+        query = {"primaryDomainId": primaryDomainId}
         update = {
-            "$addToSet": {"domainIds": {"$each": self.domainIds}, "dataSources": {"$each": self.dataSources}},
+            "$addToSet": {"domainIds": {"$each": domainIds}, "dataSources": {"$each": dataSources}},
             "$set": {
                 "updated": tnow,
-                "chromosome": self.chromosome,
-                "position": self.position,
-                "referenceSequence": self.referenceSequence,
-                "alternativeSequence": self.alternativeSequence,
-                "variantType": self.variantType,
+                "chromosome": chromosome,
+                "position": position,
+                "referenceSequence": referenceSequence,
+                "alternativeSequence": alternativeSequence,
+                "variantType": variantType,
             },
             "$setOnInsert": {
                 "created": tnow,
-                "type": self.node_type,
+                "type": cls.node_type,
             },
         }
 
@@ -1,11 +1,13 @@
 import gzip as _gzip
-from itertools import chain
+import re as _re
+import sys as _sys
 from lxml import etree as _let
 from collections import defaultdict as _defaultdict
-from csv import DictReader as _DictReader
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 from functools import lru_cache as _lru_cache
+from operator import itemgetter as _itemgetter
 
-from more_itertools import chunked as _chunked
+from pymongo import WriteConcern as _WriteConcern
 from tqdm import tqdm as _tqdm
 
 from nedrexdb.db import MongoInstance
@@ -19,45 +21,55 @@ from nedrexdb.logger import logger
 
 get_file_location = _get_file_location_factory("clinvar")
 
+_CHUNK_SIZE = 100_000
+
+
+_XML_DISORDER_FORMATTERS = {
+    "MONDO": lambda id: f"mondo.{id.removeprefix('MONDO:')}",
+    "OMIM": "omim.{}".format,
+    "Orphanet": "orhanet.{}".format,
+    "MeSH": "mesh.{}".format,
+}
+_XML_DISORDER_IGNORED = frozenset({"Human Phenotype Ontology", "EFO", "Gene", "MedGen"})
+
 
 def xml_disorder_mapper(id, db):
-    if db == "MONDO":
-        return f"mondo.{id.replace('MONDO:', '')}"
-    elif db == "OMIM":
-        return f"omim.{id}"
-    elif db == "Orphanet":
-        return f"orhanet.{id}"
-    elif db == "MeSH":
-        return f"mesh.{id}"
-    elif db in {"Human Phenotype Ontology", "EFO", "Gene", "MedGen"}:
-        return None
-    else:
+    formatter = _XML_DISORDER_FORMATTERS.get(db)
+    if formatter is not None:
+        return formatter(id)
+    if db not in _XML_DISORDER_IGNORED:
         logger.warning(f"database given without handler: {db!r}")
+    return None
 
 
 def disorder_domain_id_to_primary_id_map():
     d = _defaultdict(list)
-    for doc in Disorder.find(MongoInstance.DB):
+    projection = {"domainIds": 1, "primaryDomainId": 1, "_id": 0}
+    for doc in Disorder.find(MongoInstance.DB, projection=projection, batch_size=10_000):
         for domain_id in doc["domainIds"]:
             d[domain_id].append(doc["primaryDomainId"])
-    return d
+    return {domain_id: tuple(primary_ids) for domain_id, primary_ids in d.items()}
+
+
+def _primary_domain_ids(model):
+    projection = {"primaryDomainId": 1, "_id": 0}
+    cursor = model.find(MongoInstance.DB, projection=projection, batch_size=50_000)
+    return frozenset(map(_itemgetter("primaryDomainId"), cursor))
 
 
 def get_variant_list():
-    variants = {doc["primaryDomainId"] for doc in GenomicVariant.find(MongoInstance.DB)}
-    return variants
+    return _primary_domain_ids(GenomicVariant)
 
 
-@_lru_cache(maxsize=None)
-def get_disorder_by_domain_id(domain_id: str):
-    query = {"domainIds": domain_id}
-    return [doc["primaryDomainId"] for doc in Disorder.find(MongoInstance.DB, query)]
+# ClinVar has only a few distinct classifications and review statuses, so the
+# values attached to the (millions of) variant-disorder updates are shared
+# rather than allocated per record. None of them is mutated after creation.
+_CLINVAR_DATA_SOURCES = ("clinvar",)
 
 
 @_lru_cache(maxsize=None)
-def get_variant_by_primary_domain_id(pdid: str):
-    query = {"primaryDomainId": pdid}
-    return GenomicVariant.find_one(MongoInstance.DB, query)
+def _effects(classification):
+    return (_sys.intern(classification),)
 
 
 class ClinVarXMLParser:
@@ -72,70 +84,61 @@ class ClinVarXMLParser:
 
         with _gzip.open(self.fname, "rb") as f:
             for _, elem in _let.iterparse(f, events=("end",), tag="VariationArchive"):
-                if elem.get('VariationID') is not None:
-                    variant_pdid = f"clinvar.{elem.get('VariationID')}"
-                else:
-                    variant_pdid = None
-                if variant_pdid in variant_ids:
-                    classified_record = elem.find("ClassifiedRecord")
-
-                    if classified_record is not None:
-
-                        clinical_assertion_list = classified_record.find("ClinicalAssertionList")
-
-                        if clinical_assertion_list is not None:
-                            clinical_assertions = clinical_assertion_list.findall("ClinicalAssertion")
-
-                            for clinical_assertion in clinical_assertions:
-
-                                trait_set = clinical_assertion.find("TraitSet")
-                                if trait_set is not None:
-                                    traits = trait_set.findall("Trait")
-                                    traits = chain(
-                                        *[
-                                            [xref.attrib for xref in trait.findall("XRef")]
-                                            for trait in traits
-                                            if trait.get("Type") == "Disease"
-                                        ]
-                                    )
-                                    traits = {xml_disorder_mapper(item["ID"], item["DB"]) for item in traits}
-                                    traits = set(
-                                        chain(
-                                            *[disorder_domain_id_map.get(domain_id, []) for domain_id in traits if
-                                              domain_id]
-                                        )
-                                    )
-                                    traits.discard(None)
-
-                                classification = clinical_assertion.find("Classification")
-                                if classification is not None:
-                                    effects_elem = classification.find(
-                                        "GermlineClassification")
-                                    review_status_elem = classification.find("ReviewStatus")
-
-                                    effects = [
-                                        effects_elem.text] if effects_elem is not None and effects_elem.text else []
-                                    review_status = review_status_elem.text if review_status_elem is not None else "Unknown"
-
-                                clinvar_accession = clinical_assertion.find("ClinVarAccession")
-                                if clinvar_accession is not None:
-                                    acc = clinvar_accession.get("Accession")
-                                else:
-                                    acc = None
-
-                                if traits and acc:
-                                    for trait in traits:
-                                        vawd = VariantAssociatedWithDisorder(
-                                            sourceDomainId=variant_pdid,
-                                            targetDomainId=trait,
-                                            accession=acc,
-                                            effects=effects,
-                                            reviewStatus=review_status,
-                                            dataSources=["clinvar"],
-                                        )
-                                        yield vawd
-
+                variation_id = elem.get("VariationID")
+                if variation_id is not None:
+                    variant_pdid = f"clinvar.{variation_id}"
+                    if variant_pdid in variant_ids:
+                        yield from self._parse_variation_archive(elem, variant_pdid, disorder_domain_id_map)
+
+                # Clearing the element alone leaves an empty node attached to
+                # the root for every VariationArchive; drop the processed
+                # siblings too so memory stays flat over the whole file.
                 elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+    @staticmethod
+    def _parse_variation_archive(elem, variant_pdid, disorder_domain_id_map):
+        for clinical_assertion in elem.iterfind("ClassifiedRecord/ClinicalAssertionList/ClinicalAssertion"):
+            clinvar_accession = clinical_assertion.find("ClinVarAccession")
+            acc = clinvar_accession.get("Accession") if clinvar_accession is not None else None
+            if not acc:
+                continue
+
+            trait_set = clinical_assertion.find("TraitSet")
+            if trait_set is None:
+                continue
+
+            traits = set()
+            for xref in trait_set.iterfind("Trait[@Type='Disease']/XRef"):
+                domain_id = xml_disorder_mapper(xref.get("ID"), xref.get("DB"))
+                if domain_id:
+                    traits.update(disorder_domain_id_map.get(domain_id, ()))
+            if not traits:
+                continue
+
+            effects = ()
+            review_status = "Unknown"
+            classification = clinical_assertion.find("Classification")
+            if classification is not None:
+                effects_elem = classification.find("GermlineClassification")
+                if effects_elem is not None and effects_elem.text:
+                    effects = _effects(effects_elem.text)
+                review_status_elem = classification.find("ReviewStatus")
+                if review_status_elem is not None:
+                    review_status = review_status_elem.text
+                    if review_status is not None:
+                        review_status = _sys.intern(review_status)
+
+            for trait in traits:
+                yield VariantAssociatedWithDisorder.build_update(
+                    sourceDomainId=variant_pdid,
+                    targetDomainId=trait,
+                    accession=acc,
+                    effects=effects,
+                    reviewStatus=review_status,
+                    dataSources=_CLINVAR_DATA_SOURCES,
+                )
 
 
 class ClinVarVCFParser:
@@ -154,101 +157,133 @@ class ClinVarVCFParser:
         self.fname = fname
 
     def iter_rows(self):
+        # VCF has no quoting, so rows are split on tabs directly rather than going
+        # through csv.DictReader. Blank lines are skipped, as DictReader did.
+        fieldnames = self.fieldnames
         with _gzip.open(self.fname, "rt") as f:
-            f = (line for line in f if not line.startswith("#"))
-            reader = _DictReader(f, fieldnames=self.fieldnames, delimiter="\t")
-            for row in reader:
-                row["INFO"] = {k: v for k, v in [i.split("=", 1) for i in row["INFO"].split(";")]}
-                yield row
-
-
-class ClinVarRow:
-    def __init__(self, row):
-        self._row = row
-
-    @property
-    def identifier(self):
-        return f"clinvar.{self._row['ID']}"
-
-    def get_rs(self):
-        if self._row["INFO"].get("RS"):
-            return [f"dbsnp.{i}" for i in self._row["INFO"]["RS"].split("|")]
-        else:
-            return []
-
-    @property
-    def chromosome(self):
-        return self._row["CHROM"]
-
-    @property
-    def position(self):
-        return int(self._row["POS"])
-
-    @property
-    def reference(self):
-        return self._row["REF"]
-
-    @property
-    def alternative(self):
-        return self._row["ALT"]
-
-    @property
-    def variant_type(self):
-        variant_type = self._row["INFO"].get("CLNVC")
-        return variant_type.replace("_", " ").title()
-
-    @property
-    def associated_genes(self):
-        gene_info = self._row["INFO"].get("GENEINFO")
-        if not gene_info:
-            return []
-
-        gene_info = [info.split(":")[1] for info in gene_info.split("|")]
-        return [f"entrez.{entrez_id}" for entrez_id in gene_info]
-
-    def parse_variant(self):
-        return GenomicVariant(
-            primaryDomainId=self.identifier,
-            domainIds=[self.identifier] + self.get_rs(),
-            chromosome=self.chromosome,
-            position=self.position,
-            referenceSequence=self.reference,
-            alternativeSequence=self.alternative,
-            variantType=self.variant_type,
-            dataSources=["clinvar"],
-        )
-
-    def parse_variant_gene_relationships(self):
-        for gene in self.associated_genes:
-            yield VariantAffectsGene(sourceDomainId=self.identifier, targetDomainId=gene, dataSources=["clinvar"])
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                yield dict(zip(fieldnames, line.rstrip("\n").split("\t", 7)))
 
 
-def parse():
-    fname = get_file_location("human_data")
-    parser = ClinVarVCFParser(fname)
+# Only a handful of the INFO keys are used, so rather than splitting the whole
+# field into a dict for every row, just those keys are pulled out.
+_INFO_RE = _re.compile(r"(?:^|;)(RS|CLNVC|GENEINFO)=([^;]*)")
+
 
-    updates = (ClinVarRow(i).parse_variant().generate_update() for i in parser.iter_rows())
-    for chunk in _tqdm(_chunked(updates, 100_000), desc="Parsing ClinVar genomic variants", leave=False):
-        MongoInstance.DB[GenomicVariant.collection_name].bulk_write(chunk)
+def parse_info(info):
+    return dict(_INFO_RE.findall(info))
 
-    def iter_variant_gene_relationships():
-        for row in parser.iter_rows():
-            yield from ClinVarRow(row).parse_variant_gene_relationships()
 
-    gene_ids = {doc["primaryDomainId"] for doc in Gene.find(MongoInstance.DB)}
+def _associated_genes(info):
+    gene_info = info.get("GENEINFO")
+    if not gene_info:
+        return []
+    return [f"entrez.{item.split(':')[1]}" for item in gene_info.split("|")]
 
-    updates = (vgr.generate_update() for vgr in iter_variant_gene_relationships() if vgr.targetDomainId in gene_ids)
-    for chunk in _tqdm(
-        _chunked(updates, 100_000), desc="Parsing ClinVar genomic variant-gene relationships", leave=False
-    ):
-        MongoInstance.DB[VariantAffectsGene.collection_name].bulk_write(chunk)
 
+def row_to_variant_update(identifier, row, info):
+    domain_ids = [identifier]
+    rs = info.get("RS")
+    if rs:
+        domain_ids.extend(f"dbsnp.{i}" for i in rs.split("|"))
+
+    return GenomicVariant.build_update(
+        primaryDomainId=identifier,
+        domainIds=domain_ids,
+        dataSources=_CLINVAR_DATA_SOURCES,
+        chromosome=row["CHROM"],
+        position=int(row["POS"]),
+        referenceSequence=row["REF"],
+        alternativeSequence=row["ALT"],
+        variantType=info["CLNVC"].replace("_", " ").title(),
+    )
+
+
+def _collection(model):
+    # Acknowledge writes without waiting for the journal (w=1, j=False). All
+    # ClinVar writes are idempotent upserts, so anything lost in a crash is
+    # simply rewritten by re-running the import.
+    return MongoInstance.DB[model.collection_name].with_options(write_concern=_WriteConcern(w=1, j=False))
+
+
+# Buffers updates per model and runs their bulk writes on a worker thread, so
+# parsing the next chunk overlaps with MongoDB applying the current one. At most
+# one write is in flight: submitting a chunk first waits for the previous write,
+# which bounds memory and surfaces write errors in the parsing thread.
+class _BulkWriter:
+    def __init__(self, chunk_size=_CHUNK_SIZE):
+        self._chunk_size = chunk_size
+        self._executor = _ThreadPoolExecutor(max_workers=1)
+        self._buffers = {}
+        self._pending = None
+
+    def add(self, model, update):
+        buffer = self._buffers.get(model)
+        if buffer is None:
+            buffer = self._buffers[model] = []
+
+        buffer.append(update)
+        if len(buffer) >= self._chunk_size:
+            self._submit(model)
+
+    def _submit(self, model):
+        buffer = self._buffers.pop(model, None)
+        if not buffer:
+            return
+        self.wait()
+        self._pending = self._executor.submit(_collection(model).bulk_write, buffer, ordered=False)
+
+    def wait(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def flush(self):
+        for model in list(self._buffers):
+            self._submit(model)
+        self.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def parse():
+    gene_ids = _primary_domain_ids(Gene)
+
+    fname = get_file_location("human_data")
+    parser = ClinVarVCFParser(fname)
+
+    # Variants and variant-gene relationships come from the same rows, so both
+    # are built in a single pass over the (large, gzipped) VCF.
+    with _BulkWriter() as writer:
+        for row in _tqdm(
+            parser.iter_rows(), desc="Parsing ClinVar genomic variants and variant-gene relationships", leave=False
+        ):
+            identifier = f"clinvar.{row['ID']}"
+            info = parse_info(row["INFO"])
+            writer.add(GenomicVariant, row_to_variant_update(identifier, row, info))
+
+            for gene in _associated_genes(info):
+                if gene in gene_ids:
+                    update = VariantAffectsGene.build_update(
+                        sourceDomainId=identifier, targetDomainId=gene, dataSources=_CLINVAR_DATA_SOURCES
+                    )
+                    writer.add(VariantAffectsGene, update)
 
     fname = get_file_location("human_data_xml")
 
     parser = ClinVarXMLParser(fname)
-    updates = (i.generate_update() for i in parser.iter_parse())
-    for chunk in _tqdm(
-        _chunked(updates, 100_000), desc="Parsing ClinVar genomic variant-disorder relationships", leave=False
-    ):
-        MongoInstance.DB[VariantAssociatedWithDisorder.collection_name].bulk_write(chunk)
+    with _BulkWriter() as writer:
+        for update in _tqdm(
+            parser.iter_parse(), desc="Parsing ClinVar genomic variant-disorder relationships", leave=False
+        ):
+            writer.add(VariantAssociatedWithDisorder, update)
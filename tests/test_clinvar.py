@@ -0,0 +1,103 @@
+from lxml import etree
+
+from nedrexdb.db.parsers import clinvar
+
+
+class TestParseInfo:
+    def test_keys_in_any_position(self):
+        info = "RS=1234;ALLELEID=1;CLNVC=single_nucleotide_variant;ORIGIN=1;GENEINFO=BRCA1:672"
+        assert clinvar.parse_info(info) == {
+            "RS": "1234",
+            "CLNVC": "single_nucleotide_variant",
+            "GENEINFO": "BRCA1:672",
+        }
+
+    def test_only_used_keys_are_kept(self):
+        assert clinvar.parse_info("ALLELEID=1;CLNSIG=Benign;ORIGIN=1") == {}
+
+    def test_lookalike_keys_do_not_match(self):
+        # The look-alikes come last so that a loose match would overwrite the real values.
+        info = "CLNVC=Deletion;GENEINFO=NBR2:10230;CLNVCSO=SO:0001483;CLNGENEINFO=X:1;CLNDISDB=MedGen:RS=5"
+        assert clinvar.parse_info(info) == {"CLNVC": "Deletion", "GENEINFO": "NBR2:10230"}
+
+    def test_missing_rs(self):
+        info = clinvar.parse_info("ALLELEID=1;CLNVC=Deletion")
+        assert "RS" not in info
+        assert info == {"CLNVC": "Deletion"}
+
+
+class TestAssociatedGenes:
+    def test_multiple_genes(self):
+        info = {"GENEINFO": "BRCA1:672|NBR2:10230"}
+        assert clinvar._associated_genes(info) == ["entrez.672", "entrez.10230"]
+
+    def test_no_genes(self):
+        assert clinvar._associated_genes({}) == []
+        assert clinvar._associated_genes({"GENEINFO": ""}) == []
+
+
+VARIATION_ARCHIVE = """
+<VariationArchive VariationID="12">
+  <ClassifiedRecord>
+    <ClinicalAssertionList>
+      <ClinicalAssertion>
+        <TraitSet><Trait Type="Disease"><XRef DB="OMIM" ID="2"/></Trait></TraitSet>
+      </ClinicalAssertion>
+      <ClinicalAssertion>
+        <ClinVarAccession Accession="SCV2"/>
+      </ClinicalAssertion>
+      <ClinicalAssertion>
+        <ClinVarAccession Accession="SCV3"/>
+        <Classification>
+          <ReviewStatus>criteria provided, single submitter</ReviewStatus>
+          <GermlineClassification>Pathogenic</GermlineClassification>
+        </Classification>
+        <TraitSet>
+          <Trait Type="Finding"><XRef DB="OMIM" ID="1"/></Trait>
+          <Trait Type="Disease">
+            <Name><XRef DB="OMIM" ID="4"/></Name>
+            <XRef DB="OMIM" ID="2"/>
+            <XRef DB="MONDO" ID="MONDO:3"/>
+            <XRef DB="MedGen" ID="C1"/>
+          </Trait>
+        </TraitSet>
+      </ClinicalAssertion>
+      <ClinicalAssertion>
+        <ClinVarAccession Accession="SCV4"/>
+        <TraitSet><Trait Type="Finding"><XRef DB="OMIM" ID="1"/></Trait></TraitSet>
+      </ClinicalAssertion>
+      <ClinicalAssertion>
+        <ClinVarAccession Accession="SCV5"/>
+        <TraitSet><Trait Type="Disease"><XRef DB="OMIM" ID="2"/></Trait></TraitSet>
+      </ClinicalAssertion>
+    </ClinicalAssertionList>
+  </ClassifiedRecord>
+</VariationArchive>
+"""
+
+
+def test_parse_variation_archive():
+    disorder_domain_id_map = {
+        "omim.1": ("mondo.1",),
+        "omim.2": ("mondo.2",),
+        "mondo.3": ("mondo.3",),
+        "omim.4": ("mondo.4",),
+    }
+    elem = etree.fromstring(VARIATION_ARCHIVE)
+    updates = clinvar.ClinVarXMLParser._parse_variation_archive(elem, "clinvar.12", disorder_domain_id_map)
+
+    parsed = sorted(
+        (
+            update._filter["accession"],
+            update._doc["$set"]["sourceDomainId"],
+            update._doc["$set"]["targetDomainId"],
+            update._doc["$set"]["reviewStatus"],
+            tuple(update._doc["$addToSet"]["effects"]["$each"]),
+        )
+        for update in updates
+    )
+    assert parsed == [
+        ("SCV3", "clinvar.12", "mondo.2", "criteria provided, single submitter", ("Pathogenic",)),
+        ("SCV3", "clinvar.12", "mondo.3", "criteria provided, single submitter", ("Pathogenic",)),
+        ("SCV5", "clinvar.12", "mondo.2", "Unknown", ()),
+    ]
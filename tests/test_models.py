@@ -0,0 +1,130 @@
+import datetime
+from types import SimpleNamespace
+
+import bson
+import pytest
+from pymongo import UpdateOne
+
+from nedrexdb.db.models.edges import variant_affects_gene, variant_associated_with_disorder
+from nedrexdb.db.models.nodes import genomic_variant
+from nedrexdb.db.parsers.clinvar import _CLINVAR_DATA_SOURCES, _effects
+
+NOW = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return NOW
+
+    frozen = SimpleNamespace(datetime=FrozenDatetime)
+    for module in (genomic_variant, variant_affects_gene, variant_associated_with_disorder):
+        monkeypatch.setattr(module, "_datetime", frozen)
+
+
+def assert_same_bson(update, expected):
+    # The ClinVar parser passes tuples where the models hold lists; both must
+    # encode to the same BSON arrays.
+    assert update._filter == expected._filter
+    assert bson.encode(update._doc) == bson.encode(expected._doc)
+
+
+class TestGenomicVariant:
+    fields = {
+        "primaryDomainId": "clinvar.1",
+        "domainIds": ["clinvar.1", "dbsnp.2"],
+        "dataSources": ["clinvar"],
+        "chromosome": "1",
+        "position": 100,
+        "referenceSequence": "A",
+        "alternativeSequence": "G",
+        "variantType": "Single Nucleotide Variant",
+    }
+    expected = UpdateOne(
+        {"primaryDomainId": "clinvar.1"},
+        {
+            "$addToSet": {"domainIds": {"$each": ["clinvar.1", "dbsnp.2"]}, "dataSources": {"$each": ["clinvar"]}},
+            "$set": {
+                "updated": NOW,
+                "chromosome": "1",
+                "position": 100,
+                "referenceSequence": "A",
+                "alternativeSequence": "G",
+                "variantType": "Single Nucleotide Variant",
+            },
+            "$setOnInsert": {"created": NOW, "type": "GenomicVariant"},
+        },
+        upsert=True,
+    )
+
+    def test_generate_update(self):
+        assert genomic_variant.GenomicVariant(**self.fields).generate_update() == self.expected
+
+    def test_build_update(self):
+        assert genomic_variant.GenomicVariant.build_update(**self.fields) == self.expected
+
+    def test_build_update_with_parser_values(self):
+        fields = {**self.fields, "dataSources": _CLINVAR_DATA_SOURCES}
+        assert_same_bson(genomic_variant.GenomicVariant.build_update(**fields), self.expected)
+
+
+class TestVariantAffectsGene:
+    fields = {"sourceDomainId": "clinvar.1", "targetDomainId": "entrez.3", "dataSources": ["clinvar"]}
+    expected = UpdateOne(
+        {"sourceDomainId": "clinvar.1", "targetDomainId": "entrez.3"},
+        {
+            "$set": {"updated": NOW, "type": "VariantAffectsGene"},
+            "$setOnInsert": {"created": NOW},
+            "$addToSet": {"dataSources": {"$each": ["clinvar"]}},
+        },
+        upsert=True,
+    )
+
+    def test_generate_update(self):
+        assert variant_affects_gene.VariantAffectsGene(**self.fields).generate_update() == self.expected
+
+    def test_build_update(self):
+        assert variant_affects_gene.VariantAffectsGene.build_update(**self.fields) == self.expected
+
+    def test_build_update_with_parser_values(self):
+        fields = {**self.fields, "dataSources": _CLINVAR_DATA_SOURCES}
+        assert_same_bson(variant_affects_gene.VariantAffectsGene.build_update(**fields), self.expected)
+
+
+class TestVariantAssociatedWithDisorder:
+    model = variant_associated_with_disorder.VariantAssociatedWithDisorder
+    fields = {
+        "sourceDomainId": "clinvar.1",
+        "targetDomainId": "mondo.4",
+        "accession": "SCV000000001",
+        "effects": ["Pathogenic"],
+        "reviewStatus": "criteria provided, single submitter",
+        "dataSources": ["clinvar"],
+    }
+    expected = UpdateOne(
+        {"accession": "SCV000000001"},
+        {
+            "$set": {
+                "updated": NOW,
+                "type": "VariantAssociatedWithDisorder",
+                "sourceDomainId": "clinvar.1",
+                "targetDomainId": "mondo.4",
+                "reviewStatus": "criteria provided, single submitter",
+            },
+            "$addToSet": {"effects": {"$each": ["Pathogenic"]}, "dataSources": {"$each": ["clinvar"]}},
+            "$setOnInsert": {"created": NOW},
+        },
+        upsert=True,
+    )
+
+    def test_generate_update(self):
+        assert self.model(**self.fields).generate_update() == self.expected
+
+    def test_build_update(self):
+        assert self.model.build_update(**self.fields) == self.expected
+
+    def test_build_update_with_parser_values(self):
+        fields = {**self.fields, "effects": _effects("Pathogenic"), "dataSources": _CLINVAR_DATA_SOURCES}
+        assert_same_bson(self.model.build_update(**fields), self.expected)